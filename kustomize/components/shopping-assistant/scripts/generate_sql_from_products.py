@@ -14,6 +14,11 @@
 
 import json
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
 table_name = "catalog_items"
 fields = [
     'id', 'name', 'description', 'picture', 
@@ -22,8 +27,8 @@ fields = [
 ]
 
 # Load the produts JSON
-with open("products.json", 'r') as f:
-    data = json.load(f)
+with open("products.json", 'rb') as f:
+    data = orjson.loads(f.read()) if orjson else json.load(f)
 
 # Generate SQL INSERT statements
 for product in data['products']:
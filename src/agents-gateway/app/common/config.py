@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import functools
-from typing import Optional
+from typing import Annotated, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, BeforeValidator, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -18,6 +18,14 @@ class Settings(BaseSettings):
     DB_NAME: Optional[str] = Field(None)
     DB_USER: str = Field("postgres")
     DB_PASSWORD: Optional[str] = Field(None)
+    # pgvector type of the embedding columns; "halfvec" halves storage and
+    # scan bandwidth once the columns and indexes have been migrated
+    VECTOR_TYPE: Literal["vector", "halfvec"] = Field("vector")
+    # multimodalembedding@001 output size; must match the stored columns.
+    # 512 keeps most recall at ~1/3 the storage/ANN cost. Env values arrive as
+    # strings, so coerce to int before checking the allowed sizes.
+    EMBEDDING_DIMENSION: Annotated[Literal[128, 256, 512, 1408],
+                                   BeforeValidator(int)] = Field(1408)
 
     # Limits
     API_TOP_K_MAX: int = Field(50)
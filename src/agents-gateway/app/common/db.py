@@ -2,18 +2,24 @@ from __future__ import annotations
 
 import functools
 import os
+import threading
 from typing import Any, Dict, Optional
 import logging
 
 import psycopg2
 from google.cloud import secretmanager
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import ThreadedConnectionPool
 
 from .config import get_settings
 
 logger = logging.getLogger(__name__)
 
-_pool: Optional[SimpleConnectionPool] = None
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# HNSW candidate list size per index scan. Category filters are applied after
+# the scan, so this must comfortably exceed top_k; set once per connection.
+HNSW_EF_SEARCH = 100
 
 
 def get_secret_payload(project, secret, version="latest") -> str:
@@ -27,19 +33,23 @@ def get_secret_payload(project, secret, version="latest") -> str:
 
 def init_pool():
     global _pool
-    if _pool is None:
-        # Check if we should use AlloyDB connector
-        alloydb_cluster_name = os.environ.get("ALLOYDB_CLUSTER_NAME")
-        if alloydb_cluster_name:
-            logger.info("Using AlloyDB connector approach")
-            _pool = init_alloydb_pool()
-        else:
-            logger.info("Using direct IP connection approach")
-            _pool = init_direct_pool()
+    if _pool is not None:
+        return _pool
+    # Concurrent first requests must not each build (and leak) a pool
+    with _pool_lock:
+        if _pool is None:
+            # Check if we should use AlloyDB connector
+            alloydb_cluster_name = os.environ.get("ALLOYDB_CLUSTER_NAME")
+            if alloydb_cluster_name:
+                logger.info("Using AlloyDB connector approach")
+                _pool = init_alloydb_pool()
+            else:
+                logger.info("Using direct IP connection approach")
+                _pool = init_direct_pool()
     return _pool
 
 
-def init_direct_pool() -> SimpleConnectionPool:
+def init_direct_pool() -> ThreadedConnectionPool:
     """Initialize connection pool using direct IP connection (legacy)."""
     global _pool
     s = get_settings()
@@ -54,7 +64,7 @@ def init_direct_pool() -> SimpleConnectionPool:
             raise RuntimeError(
                 f"Failed to access secret: {alloydb_secret_name}") from e
 
-    _pool = SimpleConnectionPool(
+    _pool = ThreadedConnectionPool(
         minconn=1,
         maxconn=10,
         host=s.DB_HOST,
@@ -62,10 +72,31 @@ def init_direct_pool() -> SimpleConnectionPool:
         dbname=s.DB_NAME,
         user=s.DB_USER,
         password=password,
+        options=f"-c hnsw.ef_search={HNSW_EF_SEARCH}",
     )
     return _pool
 
 
+def _alloydb_connect(connector, connection_string: str, database: str, password: str):
+    """Open a pg8000 connection through a shared AlloyDB connector."""
+    # Use standard password authentication
+    conn = connector.connect(
+        connection_string,
+        "pg8000",
+        user="postgres",
+        db=database,
+        password=password,
+    )
+    # Session-level GUC, set once here so searches pay no extra round trip
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SET hnsw.ef_search = {HNSW_EF_SEARCH}")
+    finally:
+        cur.close()
+    conn.commit()
+    return conn
+
+
 def init_alloydb_pool():
     """Initialize connection pool using AlloyDB connector."""
 
@@ -88,20 +119,18 @@ def init_alloydb_pool():
         from google.cloud.alloydb.connector import Connector
         import pg8000
 
-        def getconn():
-            # AlloyDB connector expects format: projects/<PROJECT>/locations/<REGION>/clusters/<CLUSTER>/instances/<INSTANCE>
-            connection_string = f"projects/{project_id}/locations/{region}/clusters/{alloydb_cluster_name}/instances/{alloydb_instance_name}"
-
-            # Use standard password authentication
-            connector = Connector()
-            conn = connector.connect(
-                connection_string,
-                "pg8000",
-                user="postgres",
-                db=alloydb_database_name,
-                password=password,
-            )
-            return conn
+        # AlloyDB connector expects format: projects/<PROJECT>/locations/<REGION>/clusters/<CLUSTER>/instances/<INSTANCE>
+        connection_string = f"projects/{project_id}/locations/{region}/clusters/{alloydb_cluster_name}/instances/{alloydb_instance_name}"
+
+        # One connector for the whole pool: it caches instance metadata and
+        # client certificates, so new connections skip that setup.
+        getconn = functools.partial(
+            _alloydb_connect,
+            Connector(),
+            connection_string,
+            alloydb_database_name,
+            password,
+        )
 
         # Create a custom pool that uses the connector
         return AlloyDBConnectionPool(getconn, minconn=1, maxconn=10)
@@ -110,7 +139,7 @@ def init_alloydb_pool():
         logger.error(
             "cloud-sql-python-connector not available, falling back to direct connection")
         # Fall back to direct connection if connector not available
-        return SimpleConnectionPool(
+        return ThreadedConnectionPool(
             minconn=1,
             maxconn=10,
             host="localhost",  # This will fail, but better than crashing
@@ -118,6 +147,7 @@ def init_alloydb_pool():
             dbname=alloydb_database_name,
             user="postgres",
             password=password,
+            options=f"-c hnsw.ef_search={HNSW_EF_SEARCH}",
         )
 
 
@@ -129,22 +159,26 @@ class AlloyDBConnectionPool:
         self.minconn = minconn
         self.maxconn = maxconn
         self._connections = []
+        self._lock = threading.Lock()
 
     def getconn(self):
         """Get a connection from the pool."""
-        if self._connections:
-            return self._connections.pop()
+        with self._lock:
+            if self._connections:
+                return self._connections.pop()
+        # Open new connections outside the lock so callers don't serialize
         return self.getconn_func()
 
     def putconn(self, conn):
         """Return a connection to the pool."""
-        if len(self._connections) < self.maxconn:
-            self._connections.append(conn)
-        else:
-            try:
-                conn.close()
-            except:
-                pass
+        with self._lock:
+            if len(self._connections) < self.maxconn:
+                self._connections.append(conn)
+                return
+        try:
+            conn.close()
+        except:
+            pass
 
 
 def get_conn():
@@ -168,9 +202,15 @@ def put_conn(conn) -> None:
         _pool.putconn(conn)
 
 
+@functools.lru_cache(maxsize=8)
+def _vector_template(dims: int) -> str:
+    return "[" + ",".join(["%.8f"] * dims) + "]"
+
+
 def vector_literal(values: list[float]) -> str:
-    # pgvector array literal format
-    return "[" + ",".join(f"{v:.8f}" for v in values) + "]"
+    # pgvector array literal format; a single %-format over a cached
+    # template formats every component in C rather than per-element f-strings
+    return _vector_template(len(values)) % tuple(values)
 
 
 def health_check() -> Dict[str, Any]:
@@ -230,7 +270,7 @@ def health_check() -> Dict[str, Any]:
                 "product_image_embedding": pie_dims,
             }
 
-            # ANN index presence (ivfflat)
+            # ANN index presence (ivfflat or hnsw)
             cur.execute(
                 """
                 SELECT indexname, indexdef
@@ -240,7 +280,11 @@ def health_check() -> Dict[str, Any]:
             )
             idx = cur.fetchall()
             checks["indexes"] = [
-                {"name": name, "ivfflat": ("USING ivfflat" in definition)}
+                {
+                    "name": name,
+                    "ivfflat": ("USING ivfflat" in definition),
+                    "hnsw": ("USING hnsw" in definition),
+                }
                 for (name, definition) in idx
             ]
         finally:
@@ -32,6 +32,10 @@ logging.basicConfig(
     level=logging.DEBUG,
     format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
 )
+# Keep client-library transport chatter out of the hot Vertex/HTTP paths;
+# DEBUG on the root logger would otherwise log every request they make.
+for _noisy in ("google.api_core", "google.auth", "urllib3", "grpc"):
+    logging.getLogger(_noisy).setLevel(logging.WARNING)
 
 # Fetch API Key from Secret Manager
 try:
@@ -1,19 +1,24 @@
 from __future__ import annotations
 
-import tempfile
+import functools
+import threading
 import logging
 from timeit import default_timer as timer
 from typing import Any, Dict, List, Optional
 import json
 import hashlib
+from collections import OrderedDict
 import os
 
 try:
     import redis  # type: ignore
 except Exception:  # pragma: no cover
     redis = None
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None
 import base64
-from decimal import Decimal
 
 from fastapi import HTTPException
 
@@ -24,7 +29,17 @@ from google.adk.tools import FunctionTool
 
 _mme = None
 _vertex_inited = False
-_embedding_cache = {}
+_vertex_lock = threading.Lock()
+# Image query literals keyed by SHA-256 of the upload, least recently used first
+_image_literal_cache: "OrderedDict[bytes, str]" = OrderedDict()
+_image_literal_cache_lock = threading.Lock()
+_IMAGE_LITERAL_CACHE_MAX = 1024
+
+# Result dict keys, in the SELECT column order of each search query
+_TEXT_RESULT_COLUMNS = ("id", "name", "description", "picture",
+                        "product_image_url", "price", "distance")
+_IMAGE_RESULT_COLUMNS = ("id", "name", "description", "picture",
+                         "product_image_url", "distance")
 
 # Redis client singleton
 _redis_client = None
@@ -51,6 +66,18 @@ def _get_redis():
         return None
 
 
+def _cache_dumps(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value)
+
+
+def _cache_loads(raw: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 def _make_cache_key(query: str, filters: Optional[Dict[str, Any]], top_k: int) -> str:
     key_data = {
         "query": query,
@@ -65,7 +92,12 @@ def _make_cache_key(query: str, filters: Optional[Dict[str, Any]], top_k: int) -
 
 def _ensure_vertex():
     global _mme, _vertex_inited
-    if not _vertex_inited:
+    if _vertex_inited:
+        return
+    # Sync tools run on a thread pool; build the shared model exactly once
+    with _vertex_lock:
+        if _vertex_inited:
+            return
         try:
             import vertexai  # type: ignore
             from vertexai.vision_models import MultiModalEmbeddingModel  # type: ignore
@@ -73,21 +105,20 @@ def _ensure_vertex():
             raise HTTPException(
                 status_code=500, detail=f"Vertex AI SDK not available: {exc}")
         s = get_settings()
-        vertexai.init(project=s.PROJECT_ID, location=s.REGION)
+        vertexai.init(project=s.PROJECT_ID, location=s.REGION,
+                      api_transport="grpc")
         _mme = MultiModalEmbeddingModel.from_pretrained(
             "multimodalembedding@001")
         _vertex_inited = True
 
 
-def _embed_text_1408(text: str) -> List[float]:
-    if text in _embedding_cache:
-        return _embedding_cache[text]
-
+def _embed_text(text: str) -> List[float]:
     _ensure_vertex()
-    # multimodalembedding@001 supports text-only; return 1408-d vector
+    dims = get_settings().EMBEDDING_DIMENSION
+    # multimodalembedding@001 supports text-only; returns an EMBEDDING_DIMENSION-d vector
     try:
         # type: ignore[attr-defined]
-        emb = _mme.get_embeddings(text=text, dimension=1408)
+        emb = _mme.get_embeddings(text=text, dimension=dims)
         # Some SDK versions return named tuple; support both
         vec = getattr(emb, "text_embedding", None)
         if vec is None:
@@ -96,41 +127,60 @@ def _embed_text_1408(text: str) -> List[float]:
             raise RuntimeError("Empty text embedding")
 
         result = list(vec)
-        _embedding_cache[text] = result
         return result
     except TypeError:
         # Fallback if signature differs: try contextual_text
         # type: ignore[attr-defined]
-        emb = _mme.get_embeddings(contextual_text=text, dimension=1408)
+        emb = _mme.get_embeddings(contextual_text=text, dimension=dims)
         vec = getattr(emb, "text_embedding", None)
         if vec is None:
             raise RuntimeError("Empty text embedding (contextual_text)")
 
         result = list(vec)
-        _embedding_cache[text] = result
         return result
 
 
-def _embed_image_1408_from_bytes(data: bytes) -> List[float]:
-    if data in _embedding_cache:
-        return _embedding_cache[data]
+@functools.lru_cache(maxsize=4096)
+def _text_query_literal(text: str) -> str:
+    # Cache the formatted pgvector literal rather than the float list:
+    # repeated queries skip both the Vertex call and re-formatting, and the
+    # string is smaller than the equivalent list of Python floats.
+    return vector_literal(_embed_text(text))
 
+
+def _embed_image_from_bytes(data: bytes) -> List[float]:
     _ensure_vertex()
     from vertexai.vision_models import Image  # type: ignore
 
-    with tempfile.NamedTemporaryFile(suffix=".img") as tmp:
-        tmp.write(data)
-        tmp.flush()
-        img = Image.load_from_file(tmp.name)
-        # type: ignore[attr-defined]
-        emb = _mme.get_embeddings(image=img, dimension=1408)
-        vec = getattr(emb, "image_embedding", None)
-        if vec is None:
-            raise RuntimeError("Empty image embedding")
-
-        result = list(vec)
-        _embedding_cache[data] = result
-        return result
+    # Hand the uploaded bytes straight to the SDK; no temp file round-trip
+    img = Image(image_bytes=data)
+    # type: ignore[attr-defined]
+    emb = _mme.get_embeddings(
+        image=img, dimension=get_settings().EMBEDDING_DIMENSION)
+    vec = getattr(emb, "image_embedding", None)
+    if vec is None:
+        raise RuntimeError("Empty image embedding")
+
+    return list(vec)
+
+
+def _image_query_literal(data: bytes) -> str:
+    # Key by content hash rather than the raw upload so the cache does not
+    # pin every image (up to MAX_UPLOAD_MB each) in memory.
+    key = hashlib.sha256(data).digest()
+    with _image_literal_cache_lock:
+        cached = _image_literal_cache.get(key)
+        if cached is not None:
+            _image_literal_cache.move_to_end(key)
+            return cached
+
+    literal = vector_literal(_embed_image_from_bytes(data))
+    with _image_literal_cache_lock:
+        _image_literal_cache[key] = literal
+        _image_literal_cache.move_to_end(key)
+        if len(_image_literal_cache) > _IMAGE_LITERAL_CACHE_MAX:
+            _image_literal_cache.popitem(last=False)
+    return literal
 
 
 def text_vector_search(query: str, filters: Optional[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
@@ -147,13 +197,15 @@ def text_vector_search(query: str, filters: Optional[Dict[str, Any]], top_k: int
     result_count = 0
     out: List[Dict[str, Any]] = []
     cache = _get_redis()
-    cache_key = _make_cache_key(query, filters, top_k)
+    # Only hash the request when there is a cache to look it up in
+    cache_key = _make_cache_key(
+        query, filters, top_k) if cache is not None else None
     cache_hit = False
     if cache is not None:
         try:
             cached = cache.get(cache_key)
             if cached:
-                parsed = json.loads(cached)
+                parsed = _cache_loads(cached)
                 if isinstance(parsed, list):
                     logging.getLogger("agents.vector_search").info(
                         "text_vector_search cache hit key=%s count=%s", cache_key[-8:], len(
@@ -162,11 +214,10 @@ def text_vector_search(query: str, filters: Optional[Dict[str, Any]], top_k: int
                     return parsed
         except Exception:
             pass
-    print(
-        f"DEBUG: text_vector_search called with query='{query}', filters={filters}, top_k={top_k}")
+    logging.getLogger("agents.vector_search").debug(
+        "text_vector_search called with query=%r, filters=%s, top_k=%s", query, filters, top_k)
     try:
-        vec = _embed_text_1408(query)
-        qvec = vector_literal(vec)
+        qvec = _text_query_literal(query)
         where = []
         # Start params list with the vector, which is now parameterized
         params: List[Any] = [qvec]
@@ -181,7 +232,7 @@ def text_vector_search(query: str, filters: Optional[Dict[str, Any]], top_k: int
         sql = (
             "SELECT id, name, description, picture, COALESCE(product_image_url, picture) as product_image_url, "
             "COALESCE((price_usd_units + (price_usd_nanos/1000000000.0))::float8, 0.0) AS price, "
-            "(product_embedding <=> %s::vector) AS distance "
+            f"(product_embedding <=> %s::{get_settings().VECTOR_TYPE}) AS distance "
             "FROM catalog_items"
             + where_sql +
             " ORDER BY distance ASC LIMIT %s"
@@ -193,29 +244,11 @@ def text_vector_search(query: str, filters: Optional[Dict[str, Any]], top_k: int
             cur = conn.cursor()
             try:
                 cur.execute(sql, params)
-                for r in cur.fetchall():
-                    price_val = r[5]
-                    if isinstance(price_val, Decimal):
-                        price_num = float(price_val)
-                    elif isinstance(price_val, (int, float)):
-                        price_num = float(price_val)
-                    else:
-                        try:
-                            price_num = float(
-                                price_val) if price_val is not None else 0.0
-                        except Exception:
-                            price_num = 0.0
-
-                    out.append({
-                        "id": r[0],
-                        "name": r[1],
-                        "description": r[2],
-                        "picture": r[3],
-                        "product_image_url": r[4],
-                        "price": price_num,
-                        "distance": float(r[6]),
-                    })
-                    result_count += 1
+                # price is COALESCE(...)::float8 and distance is float8, so
+                # both drivers already return floats; no per-row conversion
+                out = [dict(zip(_TEXT_RESULT_COLUMNS, r))
+                       for r in cur.fetchall()]
+                result_count = len(out)
             finally:
                 cur.close()
         finally:
@@ -228,13 +261,13 @@ def text_vector_search(query: str, filters: Optional[Dict[str, Any]], top_k: int
             top_k,
             result_count,
         )
-        print(
-            f"DEBUG: text_vector_search returning {result_count} results: {out}")
+        logging.getLogger("agents.vector_search").debug(
+            "text_vector_search returning %s results", result_count)
         # Write-through cache on success
         if cache is not None:
             try:
                 ttl = int(os.getenv("TEXT_SEARCH_CACHE_TTL_SEC", "3600"))
-                cache.setex(cache_key, ttl, json.dumps(out))
+                cache.setex(cache_key, ttl, _cache_dumps(out))
                 logging.getLogger("agents.vector_search").info(
                     "text_vector_search cache set key=%s ttl=%s count=%s",
                     cache_key[-8:], ttl, len(out)
@@ -254,8 +287,7 @@ def image_vector_search(image_bytes: bytes, filters: Optional[Dict[str, Any]], t
     Returns:
         A list of visually similar products.
     """
-    vec = _embed_image_1408_from_bytes(image_bytes)
-    qvec = vector_literal(vec)
+    qvec = _image_query_literal(image_bytes)
     where = []
     # Start params list with the vector, which is now parameterized
     params: List[Any] = [qvec]
@@ -264,10 +296,11 @@ def image_vector_search(image_bytes: bytes, filters: Optional[Dict[str, Any]], t
         if cat:
             where.append("categories ILIKE %s")
             params.append(f"%{cat}%")
+    where.append("product_image_embedding IS NOT NULL")
     where_sql = (" WHERE " + " AND ".join(where)) if where else ""
     sql = (
         "SELECT id, name, description, picture, COALESCE(product_image_url, picture) as product_image_url, "
-        "(product_image_embedding <=> %s::vector) AS distance "  # Use %s placeholder
+        f"(product_image_embedding <=> %s::{get_settings().VECTOR_TYPE}) AS distance "
         "FROM catalog_items"
         + where_sql +
         " ORDER BY distance ASC LIMIT %s"
@@ -279,17 +312,7 @@ def image_vector_search(image_bytes: bytes, filters: Optional[Dict[str, Any]], t
         cur = conn.cursor()
         try:
             cur.execute(sql, params)
-            out = []
-            for r in cur.fetchall():
-                out.append({
-                    "id": r[0],
-                    "name": r[1],
-                    "description": r[2],
-                    "picture": r[3],
-                    "product_image_url": r[4],
-                    "distance": float(r[5]),
-                })
-            return out
+            return [dict(zip(_IMAGE_RESULT_COLUMNS, r)) for r in cur.fetchall()]
         finally:
             cur.close()
     finally:
@@ -22,26 +22,30 @@ def _extract_user_id(ctx: Any) -> Optional[str]:
     5) invocation_id-derived fallback
     """
     try:
-        # Debug: log all available attributes on the context
-        available_attrs = [attr for attr in dir(
-            ctx) if not attr.startswith('_')]
-        logger.debug(
-            f"callbacks: _extract_user_id context attributes: {available_attrs}")
+        # Introspection below is diagnostics only; skip the dir()/repr work
+        # unless DEBUG logging is actually enabled for this logger.
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            # Debug: log all available attributes on the context
+            available_attrs = [attr for attr in dir(
+                ctx) if not attr.startswith('_')]
+            logger.debug(
+                "callbacks: _extract_user_id context attributes: %s", available_attrs)
 
-        # Check if user_content contains user information
-        user_content = getattr(ctx, "user_content", None)
-        logger.debug(
-            f"callbacks: _extract_user_id ctx.user_content = {user_content}")
-        if hasattr(user_content, '__dict__'):
+            # Check if user_content contains user information
+            user_content = getattr(ctx, "user_content", None)
             logger.debug(
-                f"callbacks: _extract_user_id user_content.__dict__ = {user_content.__dict__}")
+                "callbacks: _extract_user_id ctx.user_content = %s", user_content)
+            if hasattr(user_content, '__dict__'):
+                logger.debug(
+                    "callbacks: _extract_user_id user_content.__dict__ = %s", user_content.__dict__)
 
         # 1) Prefer a stable user id directly from context (sent from frontend)
         uid_attr = getattr(ctx, "user_id", None)
-        logger.info(f"callbacks: _extract_user_id ctx.user_id = {uid_attr}")
+        logger.debug("callbacks: _extract_user_id ctx.user_id = %s", uid_attr)
         if isinstance(uid_attr, str) and uid_attr:
-            logger.info(
-                f"callbacks: _extract_user_id using frontend userId: {uid_attr}")
+            logger.debug(
+                "callbacks: _extract_user_id using frontend userId: %s", uid_attr)
             return uid_attr
 
         # 1b) Check other potential locations for frontend-provided user ID
@@ -50,61 +54,62 @@ def _extract_user_id(ctx: Any) -> Optional[str]:
         if request_data and hasattr(request_data, '__dict__'):
             request_uid = getattr(request_data, "user_id", None) or getattr(
                 request_data, "userId", None)
-            logger.info(
-                f"callbacks: _extract_user_id request_data.user_id = {request_uid}")
+            logger.debug(
+                "callbacks: _extract_user_id request_data.user_id = %s", request_uid)
             if isinstance(request_uid, str) and request_uid:
-                logger.info(
-                    f"callbacks: _extract_user_id using request userId: {request_uid}")
+                logger.debug(
+                    "callbacks: _extract_user_id using request userId: %s", request_uid)
                 return request_uid
 
         # 2) Try session.user_id if session is attached
         session = getattr(ctx, "session", None)
         if session is not None:
             try:
-                # Debug: log session attributes
-                session_attrs = [attr for attr in dir(
-                    session) if not attr.startswith('_')]
-                logger.debug(
-                    f"callbacks: _extract_user_id session attributes: {session_attrs}")
+                if debug:
+                    # Debug: log session attributes
+                    session_attrs = [attr for attr in dir(
+                        session) if not attr.startswith('_')]
+                    logger.debug(
+                        "callbacks: _extract_user_id session attributes: %s", session_attrs)
 
                 uid2 = getattr(session, "user_id", None)
                 logger.debug(
-                    f"callbacks: _extract_user_id session.user_id = {uid2}")
+                    "callbacks: _extract_user_id session.user_id = %s", uid2)
                 if isinstance(uid2, str) and uid2:
                     return uid2
 
                 # Also check session.name for resource information
                 session_name = getattr(session, "name", None)
                 logger.debug(
-                    f"callbacks: _extract_user_id session.name = {session_name}")
+                    "callbacks: _extract_user_id session.name = %s", session_name)
             except Exception as e:
                 logger.debug(
-                    f"callbacks: _extract_user_id session access failed: {e}")
+                    "callbacks: _extract_user_id session access failed: %s", e)
 
         # 3) Check state/session_state dictionaries
         invocation_id = getattr(ctx, "invocation_id", None)
         logger.debug(
-            f"callbacks: _extract_user_id ctx.invocation_id = {invocation_id}")
+            "callbacks: _extract_user_id ctx.invocation_id = %s", invocation_id)
         state = getattr(ctx, "session_state", None) or getattr(
             ctx, "state", {}) or {}
-        logger.debug(f"callbacks: _extract_user_id state content: {state}")
-        logger.debug(f"callbacks: _extract_user_id state type: {type(state)}")
+        logger.debug("callbacks: _extract_user_id state content: %s", state)
+        logger.debug("callbacks: _extract_user_id state type: %s", type(state))
 
         # Handle ADK State object
         if hasattr(state, '__dict__'):
             try:
                 state_dict = state.__dict__
                 logger.debug(
-                    f"callbacks: _extract_user_id state.__dict__: {state_dict}")
+                    "callbacks: _extract_user_id state.__dict__: %s", state_dict)
                 if isinstance(state_dict, dict):
                     uid = state_dict.get("user_id")
                     if isinstance(uid, str) and uid:
                         logger.debug(
-                            f"callbacks: _extract_user_id found user_id in state.__dict__: {uid}")
+                            "callbacks: _extract_user_id found user_id in state.__dict__: %s", uid)
                         return uid
             except Exception as e:
                 logger.debug(
-                    f"callbacks: _extract_user_id error accessing state.__dict__: {e}")
+                    "callbacks: _extract_user_id error accessing state.__dict__: %s", e)
 
         # Handle if state has get method (dict-like)
         if hasattr(state, 'get'):
@@ -115,17 +120,17 @@ def _extract_user_id(ctx: Any) -> Optional[str]:
                     uid = user.get("id") or user.get("user_id")
                     if isinstance(uid, str) and uid:
                         logger.debug(
-                            f"callbacks: _extract_user_id found user_id in state.user: {uid}")
+                            "callbacks: _extract_user_id found user_id in state.user: %s", uid)
                         return uid
                 uid = state.get("user_id") if callable(
                     getattr(state, 'get', None)) else None
                 if isinstance(uid, str) and uid:
                     logger.debug(
-                        f"callbacks: _extract_user_id found user_id in state: {uid}")
+                        "callbacks: _extract_user_id found user_id in state: %s", uid)
                     return uid
             except Exception as e:
                 logger.debug(
-                    f"callbacks: _extract_user_id error accessing state via get: {e}")
+                    "callbacks: _extract_user_id error accessing state via get: %s", e)
 
         # Traditional dict access
         if isinstance(state, dict):
@@ -134,18 +139,18 @@ def _extract_user_id(ctx: Any) -> Optional[str]:
                 uid = user.get("id") or user.get("user_id")
                 if isinstance(uid, str) and uid:
                     logger.debug(
-                        f"callbacks: _extract_user_id found user_id in dict state.user: {uid}")
+                        "callbacks: _extract_user_id found user_id in dict state.user: %s", uid)
                     return uid
             uid = state.get("user_id")
             if isinstance(uid, str) and uid:
                 logger.debug(
-                    f"callbacks: _extract_user_id found user_id in dict state: {uid}")
+                    "callbacks: _extract_user_id found user_id in dict state: %s", uid)
                 return uid
 
         # 4) Do not use ctx.session_id because it may not match frontend session.
         sid = getattr(ctx, "session_id", None)
         logger.debug(
-            f"callbacks: _extract_user_id ctx.session_id = {sid} (ignored)")
+            "callbacks: _extract_user_id ctx.session_id = %s (ignored)", sid)
 
         # 5) Extract from session object if available (more stable than invocation_id)
         if hasattr(ctx, "session") and ctx.session:
@@ -157,13 +162,13 @@ def _extract_user_id(ctx: Any) -> Optional[str]:
                         session_id = session_resource_name.split(
                             "/sessions/")[-1]
                         if session_id:
-                            logger.info(
-                                f"callbacks: _extract_user_id using session_id: {session_id}")
+                            logger.debug(
+                                "callbacks: _extract_user_id using session_id: %s", session_id)
                             # Return the session ID directly to match frontend format
                             return session_id
             except Exception as e:
                 logger.debug(
-                    f"callbacks: _extract_user_id session extraction failed: {e}")
+                    "callbacks: _extract_user_id session extraction failed: %s", e)
 
         # 6) No fallback to invocation_id. If we cannot find a stable user id provided by the frontend,
         # return None so tools avoid writing under an incorrect cart key.
@@ -7,9 +7,12 @@ from .state import (
 )
 from .callbacks import _extract_user_id
 import base64
-from typing import Any, Dict, List
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Dict, List, Optional
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from fastapi import HTTPException
 import os
 
@@ -23,9 +26,59 @@ from google.adk.tools.tool_context import ToolContext
 
 
 FRONTEND_BASE = "http://frontend:80"
+# Endpoint URLs are fixed for the process; build them once
+CART_URL = f"{FRONTEND_BASE}/api/cart"
+CART_ADD_URL = f"{CART_URL}/add"
+CHECKOUT_URL = f"{FRONTEND_BASE}/api/checkout"
 HTTP_TIMEOUT = 10  # seconds
 logger = logging.getLogger("agents.shopping.tools")
 
+def _new_http_session() -> requests.Session:
+    session = requests.Session()
+    # The session is shared by every user's cart calls; never store cookies
+    # (e.g. the frontend's shop_session-id) so no state leaks across users.
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    # Retry transient frontend failures with backoff; urllib3's default
+    # allowed_methods leaves non-idempotent POSTs (add/checkout) alone.
+    # read=0: a hung frontend fails after one HTTP_TIMEOUT instead of
+    # holding a tool thread through every retry.
+    retries = Retry(total=3, read=0, backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20,
+                          max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Shared HTTP session so frontend calls reuse pooled keep-alive connections.
+# Built at import so concurrent tool threads never race to create it.
+_http_session = _new_http_session()
+
+
+def _get_http() -> requests.Session:
+    return _http_session
+
+
+def _resolve_user_id(tool_context: ToolContext) -> Optional[str]:
+    """Return the stable user id for a cart tool call.
+
+    Uses the callback extraction logic first, then state['user_id'] if the
+    before_tool callback seeded it.
+    """
+    user_id = _extract_user_id(tool_context)
+    if user_id:
+        return user_id
+    try:
+        state = getattr(tool_context, "state", None)
+        if isinstance(state, dict):
+            sid = state.get("user_id")
+            if isinstance(sid, str) and sid:
+                return sid
+    except Exception:
+        pass
+    return None
+
 
 # Note: The 'top_k' parameter is added to the signature to match the underlying
 # search functions, but the wrappers enforce a fixed value of 5.
@@ -57,16 +110,7 @@ def add_to_cart(number: int, tool_context: ToolContext) -> Dict[str, Any]:
     Returns:
         A normalized cart dict or {"error": "add_to_cart_failed"} on failure.
     """
-    # Extract user ID; also check state['user_id'] if callbacks seeded it
-    user_id = _extract_user_id(tool_context)
-    if not user_id:
-        try:
-            if hasattr(tool_context, "state") and isinstance(tool_context.state, dict):
-                sid = tool_context.state.get("user_id")
-                if isinstance(sid, str) and sid:
-                    user_id = sid
-        except Exception:
-            pass
+    user_id = _resolve_user_id(tool_context)
     if not user_id:
         logger.error(
             "add_to_cart: stable user_id not found in context; refusing to write cart")
@@ -120,15 +164,15 @@ def add_to_cart(number: int, tool_context: ToolContext) -> Dict[str, Any]:
     payload = {"userId": user_id,
                "productId": product_id, "quantity": quantity}
     logger.info(f"Adding to cart: {payload}")
-    url = f"{FRONTEND_BASE}/api/cart/add"
+    url = CART_ADD_URL
     try:
-        resp = requests.post(url, json=payload, timeout=HTTP_TIMEOUT)
+        resp = _get_http().post(url, json=payload, timeout=HTTP_TIMEOUT)
         logger.debug("add_to_cart POST %s status=%s body=%s",
                      url, resp.status_code, resp.text)
         resp.raise_for_status()
         # Always fetch the fresh cart after adding, to normalize response
-        cart_url = f"{FRONTEND_BASE}/api/cart?userId={user_id}"
-        cart_resp = requests.get(cart_url, timeout=HTTP_TIMEOUT)
+        cart_url = f"{CART_URL}?userId={user_id}"
+        cart_resp = _get_http().get(cart_url, timeout=HTTP_TIMEOUT)
         logger.debug("add_to_cart GET %s status=%s body=%s",
                      cart_url, cart_resp.status_code, cart_resp.text)
         cart_resp.raise_for_status()
@@ -149,24 +193,15 @@ def get_cart(tool_context: ToolContext) -> Dict[str, Any]:
     Returns:
         A normalized cart dict or {"error": "get_cart_failed"} on failure.
     """
-    # Extract user ID using the same logic as add_to_cart
-    user_id = _extract_user_id(tool_context)
-    if not user_id:
-        try:
-            if hasattr(tool_context, "state") and isinstance(tool_context.state, dict):
-                sid = tool_context.state.get("user_id")
-                if isinstance(sid, str) and sid:
-                    user_id = sid
-        except Exception:
-            pass
+    user_id = _resolve_user_id(tool_context)
     if not user_id:
         logger.error("get_cart: stable user_id not found in context")
         return {"error": "user_id_missing", "message": "Session not recognized. Please retry or refresh the page."}
 
-    url = f"{FRONTEND_BASE}/api/cart?userId={user_id}"
+    url = f"{CART_URL}?userId={user_id}"
     logger.info(f"Getting cart for user: {user_id}")
     try:
-        resp = requests.get(url, timeout=HTTP_TIMEOUT)
+        resp = _get_http().get(url, timeout=HTTP_TIMEOUT)
         logger.debug("get_cart GET %s status=%s body=%s",
                      url, resp.status_code, resp.text)
         resp.raise_for_status()
@@ -207,20 +242,12 @@ def place_order(tool_context: ToolContext) -> Dict[str, Any]:
     """
     try:
         # Ensure there is something in the cart first (source of truth: frontend API)
-        user_id = _extract_user_id(tool_context)
-        if not user_id:
-            try:
-                if hasattr(tool_context, "state") and isinstance(tool_context.state, dict):
-                    sid = tool_context.state.get("user_id")
-                    if isinstance(sid, str) and sid:
-                        user_id = sid
-            except Exception:
-                pass
+        user_id = _resolve_user_id(tool_context)
         if not user_id:
             return {"error": "user_id_missing", "message": "Session not recognized. Please retry or refresh the page."}
 
-        cart_url = f"{FRONTEND_BASE}/api/cart?userId={user_id}"
-        cart_resp = requests.get(cart_url, timeout=HTTP_TIMEOUT)
+        cart_url = f"{CART_URL}?userId={user_id}"
+        cart_resp = _get_http().get(cart_url, timeout=HTTP_TIMEOUT)
         logger.debug("place_order precheck GET %s status=%s body=%s",
                      cart_url, cart_resp.status_code, cart_resp.text)
         cart_resp.raise_for_status()
@@ -238,7 +265,7 @@ def place_order(tool_context: ToolContext) -> Dict[str, Any]:
         DEMO_ADDRESS = "1600 Amphitheatre Parkway, Mountain View, CA 94043, United States"
         DEMO_LAST4 = "0454"
 
-        url = f"{FRONTEND_BASE}/api/checkout"
+        url = CHECKOUT_URL
         payload = {
             "userId": user_id,
             "userDetails": {
@@ -250,7 +277,7 @@ def place_order(tool_context: ToolContext) -> Dict[str, Any]:
             },
         }
         logger.info("Placing order for user %s", user_id)
-        resp = requests.post(url, json=payload, timeout=HTTP_TIMEOUT)
+        resp = _get_http().post(url, json=payload, timeout=HTTP_TIMEOUT)
         logger.debug("place_order POST %s status=%s body=%s",
                      url, resp.status_code, resp.text)
         resp.raise_for_status()